@@ -7,20 +7,23 @@ December 31, 2025
 '''
 
 import chess
-import math
+import chess.polyglot
 from dataclasses import dataclass
-from eval import evaluate, PIECE_VALUES
+from eval import evaluate_relative, PIECE_VALUES, MVV_LVA, MATE_SCORE, DRAW_SCORE
 
 @dataclass
 class SearchResult:
-    score: int #Best eval
+    score: int #Best eval, positive means white is winning
     move: chess.Move | None #Best move (none if no legal moves)
 
-def move_ordering(board: chess.Board) -> list:
+def move_ordering(board: chess.Board, checks: bool = True, killers: list = (), history: list | None = None) -> list:
     '''
     Docstring for move_ordering
     Returns a list of legal moves sorted so best are tried first
     :param board: The current chess board
+    :param checks: Whether to look for checking moves, skipped at frontier nodes where it rarely pays off
+    :param killers: Quiet moves that caused a cutoff at this ply in a sibling position
+    :param history: history[from_square][to_square] cutoff counts to break ties between quiet moves
     '''
     moves = list(board.legal_moves) #List of legal moves
 
@@ -31,98 +34,370 @@ def move_ordering(board: chess.Board) -> list:
         :param move: The move
         '''
         score = 0
-        if board.is_capture(move): #Always prioiritizes captures, promotions, and checks
-            capturedPiece = board.piece_at(move.to_square)
-            attackingPiece = board.piece_at(move.from_square)
-            if capturedPiece:
-                score += 10_000 + PIECE_VALUES[capturedPiece.piece_type] * 10 #Bonus for capturing
-            if attackingPiece:
-                score -= PIECE_VALUES[attackingPiece.piece_type]
+        #Always prioiritizes captures, promotions, and checks, scored statically without playing the move
+        captured = board.piece_type_at(move.to_square)
+        if captured is None and move.to_square == board.ep_square and board.is_en_passant(move):
+            captured = chess.PAWN
+        if captured is not None: #Most valuable victim, least valuable attacker
+            score += MVV_LVA[captured][board.piece_type_at(move.from_square)] #Bonus for capturing
         if move.promotion:
             score += 9_000 + PIECE_VALUES.get(move.promotion, 0) #Bonus for promoting
-        board.push(move)
-        if board.is_check():
+        elif captured is None: #Quiet moves are ranked by killers then history
+            if move in killers:
+                score += 8_000
+            if history is not None:
+                score += history[move.from_square][move.to_square]
+        if checks and board.gives_check(move):
             score += 500 #Bonus for checking
-        board.pop() #Undo the move to try the next move
         return score
     
     moves.sort(key = key,  reverse = True) #Sort so the highest score is played in the end
     return moves
 
+def capture_ordering(board: chess.Board) -> list:
+    '''
+    Docstring for capture_ordering
+    Returns only the legal captures and promotions, most valuable victim and least valuable attacker first
+    :param board: The current chess board
+    '''
+    moves = list(board.generate_legal_captures())
+    moves.extend(board.generate_legal_moves(board.pawns, (chess.BB_RANK_1 | chess.BB_RANK_8) & ~board.occupied)) #Quiet promotions
+
+    def key(move: chess.Move) -> int:
+        '''
+        Docstring for key
+        Returns the material swing of the move for heuristic
+        :param move: The move
+        '''
+        score = PIECE_VALUES.get(move.promotion, 0)
+        captured = board.piece_type_at(move.to_square)
+        if captured is None and not move.promotion: #En passant
+            captured = chess.PAWN
+        if captured is not None:
+            score += PIECE_VALUES[captured] * 10 - PIECE_VALUES[board.piece_type_at(move.from_square)]
+        return score
+
+    moves.sort(key = key, reverse = True)
+    return moves
+
+def _put_first(moves: list, move: chess.Move | None):
+    #Move a remembered best move (PV or hash move) to the front of an ordered move list
+    if move is not None and move in moves:
+        moves.remove(move)
+        moves.insert(0, move)
+
+def _has_non_pawn_material(board: chess.Board) -> bool:
+    #Whether the side to move has a piece besides pawns and its king, null moves are unsafe in pawn endings (zugzwang)
+    return bool(board.occupied_co[board.turn] & ~(board.pawns | board.kings))
+
+ZOBRIST = chess.polyglot.POLYGLOT_RANDOM_ARRAY #Polyglot random numbers: 768 piece-square keys, then castling, en passant file, and turn
+_HASHER = chess.polyglot.ZobristHasher(ZOBRIST)
+
+def _state_key(board: chess.Board) -> int:
+    '''
+    Docstring for _state_key
+    Returns the castling, en passant, and side to move part of the Zobrist key
+    :param board: The current chess board
+    '''
+    key = 0
+    rights = board.castling_rights
+    if rights:
+        if rights & chess.BB_H1:
+            key ^= ZOBRIST[768]
+        if rights & chess.BB_A1:
+            key ^= ZOBRIST[769]
+        if rights & chess.BB_H8:
+            key ^= ZOBRIST[770]
+        if rights & chess.BB_A8:
+            key ^= ZOBRIST[771]
+    if board.ep_square is not None:
+        key ^= _HASHER.hash_ep_square(board)
+    if board.turn == chess.WHITE:
+        key ^= ZOBRIST[780]
+    return key
+
+TT_SIZE = 1 << 20 #Transposition table slots, power of two so the index is a mask
+TT_MASK = TT_SIZE - 1
+EXACT, LOWER, UPPER = 0, 1, 2 #Stored score is exact, a lower bound (failed high), or an upper bound (failed low)
+MAX_PLY = 64 #Deepest ply the killer table covers
+HISTORY_MAX = 7_000 #Keeps history scores below the killer bonus
+INF = 10 ** 9 #Integer stand-in for infinity so scores never turn into floats
+ASPIRATION_WINDOW = 50 #Centipawns either side of the previous iteration's score
+NULL_MOVE_R = 2 #Depth reduction for the null move search
+FUTILITY_MARGIN = (0, 150, 250) #By remaining depth: how far a quiet move could plausibly lift the static eval
+MATE_BOUND = MATE_SCORE - MAX_PLY #Scores beyond this are mates, stored in the table relative to the node instead of the root
+
+def _to_tt(value: int, ply: int) -> int:
+    #Mate scores count plies from the root, the table stores them counted from the node itself
+    if value >= MATE_BOUND:
+        return value + ply
+    if value <= -MATE_BOUND:
+        return value - ply
+    return value
+
+def _from_tt(value: int, ply: int) -> int:
+    #Undo _to_tt for the ply the entry is probed at
+    if value >= MATE_BOUND:
+        return value - ply
+    if value <= -MATE_BOUND:
+        return value + ply
+    return value
+
 class MiniMaxEngine:
     def __init__(self):
-        self.tt = {} #Cache to avoid reevaluating same positions --> Memoization DP
+        #Cache to avoid reevaluating same positions --> Memoization DP
+        #Fixed size always-replace table stored as parallel lists indexed by key & TT_MASK
+        self.tt_keys = [None] * TT_SIZE
+        self.tt_depth = [0] * TT_SIZE
+        self.tt_value = [0] * TT_SIZE
+        self.tt_flag = [EXACT] * TT_SIZE
+        self.tt_move = [None] * TT_SIZE #Best move found in the position, searched first next time
         self.nodes = 0 #Count nodes evaluated
+        self.killers = [[None, None] for _ in range(MAX_PLY)] #Two most recent quiet cutoff moves per ply
+        self.history = [[0] * 64 for _ in range(64)] #history[from_square][to_square] grows with every quiet cutoff
+        self._keys = [] #Stack of Zobrist keys, one per pushed move, top is the current position
     
     def _hash(self, board: chess.Board):
-        #Hashed the current board position
-        if hasattr(board, "transposition_key"):
-            return board.transposition_key()
-        if hasattr(board, "zobrist_hash"):
-            return board.zobrist_hash()
-        return hash(board.fen())
+        #Hash of the current board position, kept up to date by _push/_pop
+        return self._keys[-1]
+
+    def _seed_hash(self, board: chess.Board):
+        #Hash the root position from scratch once per search
+        self._keys = [_HASHER.hash_board(board) ^ _state_key(board)]
+
+    def _push(self, board: chess.Board, move: chess.Move):
+        '''
+        Docstring for _push
+        Plays the move and XORs the Zobrist key forward instead of rehashing the whole board
+        :param move: The move (or null move) to play
+        '''
+        key = self._keys[-1] ^ _state_key(board) #Take out the old castling/en passant/turn part
+        if move: #Null moves only change the state part
+            us = board.turn
+            from_sq = move.from_square
+            to_sq = move.to_square
+            piece_type = board.piece_type_at(from_sq)
+            key ^= ZOBRIST[64 * ((piece_type - 1) * 2 + us) + from_sq] #Lift the moving piece
+            if piece_type == chess.KING and board.is_castling(move): #King and rook both move
+                rank = chess.square_rank(from_sq)
+                if board.is_kingside_castling(move):
+                    king_to, rook_from, rook_to = chess.square(6, rank), chess.square(7, rank), chess.square(5, rank)
+                else:
+                    king_to, rook_from, rook_to = chess.square(2, rank), chess.square(0, rank), chess.square(3, rank)
+                rook = 64 * ((chess.ROOK - 1) * 2 + us)
+                key ^= ZOBRIST[64 * ((chess.KING - 1) * 2 + us) + king_to] ^ ZOBRIST[rook + rook_from] ^ ZOBRIST[rook + rook_to]
+            else:
+                if piece_type == chess.PAWN and board.is_en_passant(move): #Captured pawn sits behind the destination
+                    captured_sq = to_sq - 8 if us == chess.WHITE else to_sq + 8
+                    key ^= ZOBRIST[64 * ((chess.PAWN - 1) * 2 + (not us)) + captured_sq]
+                else:
+                    captured = board.piece_type_at(to_sq)
+                    if captured:
+                        key ^= ZOBRIST[64 * ((captured - 1) * 2 + (not us)) + to_sq]
+                key ^= ZOBRIST[64 * (((move.promotion or piece_type) - 1) * 2 + us) + to_sq] #Drop the (possibly promoted) piece
+        board.push(move)
+        self._keys.append(key ^ _state_key(board)) #Put in the new castling/en passant/turn part
+
+    def _pop(self, board: chess.Board):
+        #Undo the last move and its Zobrist key
+        board.pop()
+        self._keys.pop()
     
-    def minimax(self, board: chess.Board, depth: int, alpha: int, beta: int) -> int:
+    def minimax(self, board: chess.Board, depth: int, alpha: int, beta: int, ply: int = 0) -> int:
         '''
         Docstring for minimax algorithm
-        Returns the scores of the moves for each player
-        :param alpha: Best score for maximizing player
-        :param beta: Best score for minimizing player
+        Negamax form: returns the score from the side to move's point of view, so one branch serves both colors
+        :param alpha: Best score the side to move is already guaranteed
+        :param beta: Best score the opponent is already guaranteed
+        :param ply: Distance from the root, used to index the killer moves and count mate distance
         '''
         self.nodes += 1
-        key = (self._hash(board), depth, board.turn) #Add key to cache
-        if key in self.tt: #Check cache before evaluating to save time
-            return self.tt[key]
-        if depth == 0 or board.is_game_over(claim_draw = True): #Base case
-            val = evaluate(board)
-            self.tt[key] = val
+        key = self._hash(board)
+        idx = key & TT_MASK
+        hash_move = None
+        if self.tt_keys[idx] == key:
+            hash_move = self.tt_move[idx] #Even a shallower entry knows which move to try first
+            if self.tt_depth[idx] >= depth: #Check cache before evaluating to save time
+                val = _from_tt(self.tt_value[idx], ply)
+                flag = self.tt_flag[idx]
+                if flag == EXACT:
+                    return val
+                if flag == LOWER:
+                    alpha = max(alpha, val)
+                else:
+                    beta = min(beta, val)
+                if beta <= alpha: #Stored bound is enough for a cutoff
+                    return val
+        alpha_orig, beta_orig = alpha, beta
+        if depth == 0: #Base case, settle captures before trusting the static eval
+            val = self._qsearch(board, alpha, beta, ply)
+            if self.tt_keys[idx] is None or self.tt_depth[idx] == 0: #Leaves only fill empty or leaf slots, never evict searched nodes
+                self._store(idx, key, depth, _to_tt(val, ply), self._bound_flag(val, alpha_orig, beta_orig), None)
             return val
-        if board.turn == chess.WHITE: #Maximize white
-            best = -math.inf
-            for mv in move_ordering(board):
-                board.push(mv)
-                val = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                best = max(best, val)
-                alpha = max(alpha, best)
-                if beta <= alpha:
-                    break
-        else: #Maximize black
-            best = math.inf
-            for mv in move_ordering(board):
-                board.push(mv)
-                val = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                best = min(best, val)
-                beta = min(beta, best)
-                if beta <= alpha:
-                    break
-        self.tt[key] = int(best) #Store score in cache
-        return int(best)
+        if board.is_insufficient_material() or board.halfmove_clock >= 100: #Cheap draw checks instead of is_game_over(claim_draw = True)
+            self._store(idx, key, depth, DRAW_SCORE, EXACT, None)
+            return DRAW_SCORE
+        #Null move pruning: pass the turn and search shallower, if passing still scores at least beta a real move will too
+        if depth >= 3 and beta < MATE_BOUND and board.move_stack and board.move_stack[-1] and not board.is_check() and _has_non_pawn_material(board):
+            self._push(board, chess.Move.null())
+            val = -self.minimax(board, depth - 1 - NULL_MOVE_R, -beta, -beta + 1, ply + 1)
+            self._pop(board)
+            if val >= beta:
+                return beta
+        moves = move_ordering(board, checks = depth > 1, killers = self.killers[ply] if ply < MAX_PLY else (), history = self.history) #Generated once, also tells us if the game is over
+        if not moves: #Checkmate (sooner is worse for the mated side) or stalemate
+            val = -(MATE_SCORE - ply) if board.is_check() else DRAW_SCORE
+            self._store(idx, key, depth, _to_tt(val, ply), EXACT, None)
+            return val
+        _put_first(moves, hash_move)
+        #Futility pruning: close to the horizon, if even a generous margin can't lift the static eval to alpha, only tactical moves are worth searching
+        futile = False
+        pruned = False
+        if depth < len(FUTILITY_MARGIN) and -MATE_BOUND < alpha < MATE_BOUND and not board.is_check():
+            futility = evaluate_relative(board) + FUTILITY_MARGIN[depth]
+            futile = futility <= alpha
+        best = -INF
+        best_mv = None
+        for mv in moves:
+            if futile and not mv.promotion and not board.is_capture(mv) and not board.gives_check(mv):
+                pruned = True
+                continue
+            self._push(board, mv)
+            val = -self.minimax(board, depth - 1, -beta, -alpha, ply + 1)
+            self._pop(board)
+            if val > best:
+                best = val
+                best_mv = mv
+            alpha = max(alpha, best)
+            if beta <= alpha:
+                self._record_cutoff(board, mv, depth, ply)
+                break
+        if pruned and best < futility: #The skipped quiet moves are assumed to score at most the futility margin, so this fails low
+            best = futility
+        self._store(idx, key, depth, _to_tt(best, ply), self._bound_flag(best, alpha_orig, beta_orig), best_mv) #Store score in cache
+        return best
+
+    def _qsearch(self, board: chess.Board, alpha: int, beta: int, ply: int) -> int:
+        '''
+        Docstring for _qsearch
+        Quiescence search: keeps playing captures and promotions until the position is quiet so leaves aren't scored mid-exchange
+        Returns the score from the side to move's point of view
+        :param alpha: Best score the side to move is already guaranteed
+        :param beta: Best score the opponent is already guaranteed
+        '''
+        self.nodes += 1
+        stand = evaluate_relative(board) #Stand pat: the side to move can usually decline to capture
+        if stand == -MATE_SCORE: #Checkmated here, count the distance from the root
+            return -(MATE_SCORE - ply)
+        if stand >= beta:
+            return beta
+        alpha = max(alpha, stand)
+        for mv in capture_ordering(board):
+            self._push(board, mv)
+            score = -self._qsearch(board, -beta, -alpha, ply + 1)
+            self._pop(board)
+            if score >= beta:
+                return beta
+            alpha = max(alpha, score)
+        return alpha
+
+    @staticmethod
+    def _bound_flag(value: int, alpha: int, beta: int) -> int:
+        #Which kind of bound a score searched with the window (alpha, beta) is
+        if value <= alpha: #Failed low, real score is at most value
+            return UPPER
+        if value >= beta: #Failed high, real score is at least value
+            return LOWER
+        return EXACT
+
+    def _record_cutoff(self, board: chess.Board, move: chess.Move, depth: int, ply: int):
+        '''
+        Docstring for _record_cutoff
+        Remembers a quiet move that caused a beta cutoff as a killer and in the history table
+        '''
+        if move.promotion or board.is_capture(move): #Captures and promotions are already ordered first
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move: #Newest killer in slot 0, previous one moves to slot 1
+                killers[1] = killers[0]
+                killers[0] = move
+        row = self.history[move.from_square]
+        row[move.to_square] = min(row[move.to_square] + depth * depth, HISTORY_MAX)
+
+    def _store(self, idx: int, key: int, depth: int, value: int, flag: int, move: chess.Move | None):
+        #Write an entry into the transposition table, replacing whatever was in the slot
+        self.tt_keys[idx] = key
+        self.tt_depth[idx] = depth
+        self.tt_value[idx] = value
+        self.tt_flag[idx] = flag
+        self.tt_move[idx] = move
     
     def best_move(self, board: chess.Board, depth: int) -> SearchResult:
         '''
         Docstring for best_move
         Returns the chosen move and its score
+        Searches with iterative deepening so each depth tries the previous depth's best move first
         '''
         self.nodes = 0
+        self._seed_hash(board)
+        self.killers = [[None, None] for _ in range(MAX_PLY)] #Killers are position specific, history carries over at half weight
+        for row in self.history:
+            for to_sq in range(64):
+                row[to_sq] >>= 1
+        score, move = evaluate_relative(board), None #Returned as is if there are no legal moves
+        for d in range(1, depth + 1):
+            alpha, beta = -INF, INF
+            if d >= 3: #Scores are stable enough by now to search a narrow window around the last one
+                alpha, beta = score - ASPIRATION_WINDOW, score + ASPIRATION_WINDOW
+            while True:
+                new_score, new_move = self._search_root(board, d, move, alpha, beta) #Previous best move is searched first
+                if new_score <= alpha: #Failed low, open the window downwards and search again
+                    alpha = -INF
+                elif new_score >= beta: #Failed high, open the window upwards and search again
+                    beta = INF
+                else:
+                    break
+            score, move = new_score, new_move
+        return SearchResult(score = score if board.turn == chess.WHITE else -score, move = move)
+
+    def _search_root(self, board: chess.Board, depth: int, pv_move: chess.Move | None, alpha: int, beta: int) -> tuple:
+        '''
+        Docstring for _search_root
+        Searches every root move to the given depth and returns the best score (side to move's point of view) and move
+        A score at or outside (alpha, beta) is only a bound and the caller has to search again
+        :param pv_move: Best move from the previous iteration, searched first
+        '''
+        moves = move_ordering(board)
+        if not moves: #No legal moves, score the final position
+            return evaluate_relative(board), None
+        _put_first(moves, pv_move)
+        best_score = -INF
         best_move = None
-        if board.turn == chess.WHITE: #Choose move with highest score for white
-            best_score = -math.inf
-            for move in move_ordering(board):
-                board.push(move)
-                score = self.minimax(board, depth - 1, -math.inf, math.inf)
-                board.pop()
-                if score > best_score:
-                    best_score = score
-                    best_move = move
-        else: #Choose move with highest score for black
-            best_score = math.inf
-            for move in move_ordering(board):
-                board.push(move)
-                score = self.minimax(board, depth - 1, -math.inf, math.inf)
-                board.pop()
-                if score < best_score:
-                    best_score = score
-                    best_move = move
-        return SearchResult(score = int(best_score), move = best_move)
\ No newline at end of file
+        for move in moves:
+            self._push(board, move)
+            score = -self.minimax(board, depth - 1, -beta, -max(alpha, best_score), 1)
+            self._pop(board)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if best_score >= beta:
+                    break
+        return best_score, best_move
+
+_worker_engine = None #One engine per worker process so its tables carry over between moves
+
+def search_position(board: chess.Board, depth: int) -> tuple:
+    '''
+    Docstring for search_position
+    Entry point for running the engine in another process: takes a board copied without its move stack, returns the best move as (UCI, SAN), or (None, None) if there are no legal moves
+    :param board: The position to search, the engine pushes and pops on it freely
+    :param depth: Search depth
+    '''
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = MiniMaxEngine()
+    res = _worker_engine.best_move(board, depth)
+    if res.move is None:
+        return None, None
+    return res.move.uci(), board.san(res.move)
\ No newline at end of file
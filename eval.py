@@ -76,18 +76,27 @@ PIECE_SQUARE_TABLE = { #Heuristic for placement of a given piece
 MATE_SCORE = 10_000 #Constant for checkmate
 DRAW_SCORE = 0 #Constant for draw-like positions such as stalemate, insufficient material, etc.
 
-def pieceSquareTableValue(piece_type: chess.Piece, square: chess.Square, color: chess.Color) -> int:
+#Tables precomputed at import so evaluate doesn't mirror squares or look up dicts per piece
+#One flat set of 12 tables indexed by color * 6 + piece_type - 1, each entry is material plus placement
+#Black entries are mirrored and negated so every piece is a single lookup that is simply added
+EVAL_PIECE_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+
+def _build_tables() -> tuple:
     '''
-    Docstring for pieceSquareTableValue
-    Returns the value of the piece given its color, type, and the square it's on
-    
-    :param piece_type: Which piece it is
-    :param square: Which square it's on number 0-63 from matrices above
-    :param color: White or Black
+    Docstring for _build_tables
+    Builds the 12 signed material plus placement tables, returned as a tuple of tuples
     '''
-    table = PIECE_SQUARE_TABLE[piece_type]
-    index = square if color == chess.WHITE else chess.square_mirror(square)
-    return table[index]
+    tables = [None] * 12
+    for color in chess.COLORS:
+        for pt in EVAL_PIECE_TYPES:
+            sign = 1 if color == chess.WHITE else -1
+            tables[color * 6 + pt - 1] = tuple(sign * (PIECE_VALUES[pt] + PIECE_SQUARE_TABLE[pt][sq if color == chess.WHITE else chess.square_mirror(sq)]) for sq in range(64))
+    return tuple(tables)
+
+PST_PLUS_MATERIAL = _build_tables() #PST_PLUS_MATERIAL[index][square]
+
+#Capture ordering bonus MVV_LVA[victim][attacker]: most valuable victim first, least valuable attacker breaks ties
+MVV_LVA = tuple(tuple(10_000 + 10 * PIECE_VALUES.get(v, 0) - PIECE_VALUES.get(a, 0) for a in range(7)) for v in range(7))
 
 def evaluate(board: chess.Board) -> int:
     '''
@@ -95,15 +104,45 @@ def evaluate(board: chess.Board) -> int:
     Returns the evaluated score of the position --> Positive means white is winning
     :param board: The chess board
     '''
-    if board.is_checkmate():
-        return -MATE_SCORE if board.turn == chess.WHITE else MATE_SCORE #Whoevers turn it is has lost, return +/- mate score depending on whose turn it is
-    if board.is_stalemate() or board.is_insufficient_material() or board.can_claim_draw(): #If draw, then score is draw
+    score = evaluate_relative(board)
+    return score if board.turn == chess.WHITE else -score
+
+def evaluate_relative(board: chess.Board) -> int:
+    '''
+    Docstring for evaluate_relative
+    Returns the evaluated score of the position --> Positive means the side to move is winning (what negamax search wants)
+    :param board: The chess board
+    '''
+    if not any(board.generate_legal_moves()): #Stops at the first legal move instead of generating them all
+        if board.is_check():
+            return -MATE_SCORE #Whoevers turn it is has lost
+        return DRAW_SCORE #Stalemate
+    if board.is_insufficient_material() or board.halfmove_clock >= 100: #Cheap draw signals only, claimable repetitions are too slow to test at every leaf
         return DRAW_SCORE
     score = 0 #Game is still going, calculate score
-    for square, piece in board.piece_map().items(): #Add all the scores of pieces on a square
-        value = PIECE_VALUES[piece.piece_type] + pieceSquareTableValue(piece.piece_type, square, piece.color)
-        score += value if piece.color == chess.WHITE else -value #Add white, subtract black
-    #Mobility Heuristic: More legal moves means better positioning for person whose turn it is
-    mobility = board.legal_moves.count()
-    score += mobility if board.turn == chess.WHITE else -mobility
-    return score
\ No newline at end of file
+    white_mask = board.occupied_co[chess.WHITE]
+    black_mask = board.occupied_co[chess.BLACK]
+    for idx, mask in ((6, board.pawns & white_mask), (7, board.knights & white_mask), (8, board.bishops & white_mask), (9, board.rooks & white_mask), (10, board.queens & white_mask), (11, board.kings & white_mask),
+                      (0, board.pawns & black_mask), (1, board.knights & black_mask), (2, board.bishops & black_mask), (3, board.rooks & black_mask), (4, board.queens & black_mask), (5, board.kings & black_mask)):
+        #Straight from the bitboards, black tables are already negated so white adds and black subtracts
+        #Bits are popped inline with C-level int methods instead of going through the scan_forward generator
+        table = PST_PLUS_MATERIAL[idx]
+        while mask:
+            bit = mask & -mask
+            score += table[bit.bit_length() - 1]
+            mask ^= bit
+    #Mobility Heuristic: More squares attacked means better positioning
+    #Pseudo-legal attack counts of the minor and major pieces, a cheap stand-in for counting legal moves
+    mobile = board.knights | board.bishops | board.rooks | board.queens
+    attacks_mask = board.attacks_mask
+    pieces = mobile & white_mask
+    while pieces:
+        bit = pieces & -pieces
+        score += (attacks_mask(bit.bit_length() - 1) & ~white_mask).bit_count()
+        pieces ^= bit
+    pieces = mobile & black_mask
+    while pieces:
+        bit = pieces & -pieces
+        score -= (attacks_mask(bit.bit_length() - 1) & ~black_mask).bit_count()
+        pieces ^= bit
+    return score if board.turn == chess.WHITE else -score
\ No newline at end of file
@@ -6,12 +6,15 @@ cameron.chase@gmail.com
 December 31, 2025
 '''
 
-import threading #Different thread for AI
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor #Different process for AI so the search doesn't share the GIL with Tk
+from concurrent.futures.process import BrokenProcessPool
 import tkinter as tk
 from tkinter import messagebox, ttk
+import tkinter.font as tkfont
 import chess
 
-from engine import MiniMaxEngine
+from engine import search_position
 from eval import evaluate, MATE_SCORE
 
 UNICODE_PIECES = { #Pieces for GUI, uppercase white, lowercase black
@@ -19,15 +22,20 @@ UNICODE_PIECES = { #Pieces for GUI, uppercase white, lowercase black
     "p": "♟", "n": "♞", "b": "♝", "r": "♜", "q": "♛", "k": "♚",
 }
 
+PIECE_GLYPHS = tuple((pt, color, UNICODE_PIECES[chess.Piece(pt, color).symbol()]) for color in chess.COLORS for pt in chess.PIECE_TYPES) #(piece type, color, glyph) for all 12 pieces
+
 PROMO_MAP = {"Q": chess.QUEEN, "R": chess.ROOK, "B": chess.BISHOP, "N": chess.KNIGHT} #Pieces you can promote to
 
+EVAL_CACHE_SIZE = 200_000 #Most positions remembered by the evaluation cache before the oldest are dropped
+
 
 class ChessApp(tk.Frame):
     def __init__(self, master: tk.Tk, human_color=chess.WHITE, depth=3):
         super().__init__(master) 
         self.master = master #Root window
         self.board = chess.Board() #Board
-        self.engine = MiniMaxEngine() #Engine
+        self._pool = ProcessPoolExecutor(max_workers = 1) #Engine runs in its own process
+        self._ai_future = None #Search in progress, if any
         self.human_color = human_color #What color the player is
 
         self.depth = depth #Search depth for engine
@@ -43,12 +51,19 @@ class ChessApp(tk.Frame):
         
         self.move_objs = [] #Moves
         self.move_sans = [] #SAN Strings for each move
-        self.move_evals = [] #Evaluation for each move
         self.view_ply = None #Replay/analysis
-        self._cached_view_board = None #Cache old board
+        self._board_snapshots = [chess.Board()] #Position after every ply (index 0 is the start) so history views are a list lookup
+        self._legal_cache = None #Legal moves of the live position grouped by square, rebuilt after every move
+        self._last_rendered_plies = 0 #Plies already shown in the moves table
+        self._redraw_pending = False #A board redraw is queued for the next idle moment
+        self._eval_tt = {} #Static evaluations by position key so revisited positions aren't evaluated again
+        self._last_eval_score = None #Score and bar split currently drawn on the evaluation bar
+        self._last_eval_white_h = -1
 
         self._build_ui() #Build ui
-        self._redraw() #Draw board
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close) #Closing the window stops the engine process too
+        self.bind("<Destroy>", self._on_destroy)
+        self._schedule_redraw() #Draw board
 
         if self.board.turn != self.human_color: #If human it's not the human's turn, engine plays first move
             self._start_ai_move()
@@ -88,6 +103,29 @@ class ChessApp(tk.Frame):
         self.canvas = tk.Canvas(mid, width = w, height = h)
         self.canvas.pack(side = "left")
         self.canvas.bind("<Button-1>", self.on_click)
+        #Fonts are built once so Tk does not re-parse a font description per text item
+        self._piece_font = tkfont.Font(family = "Segoe UI Symbol", size = int(self.square_size * 0.6))
+        self._coord_font = tkfont.Font(family = "Arial", size = 14)
+        #Board items are created once and only moved or edited afterwards
+        self._recompute_geometry()
+        self._square_ids = {} #Square rectangle per square
+        for square, x, y, fill in self._sq_xy:
+            self._square_ids[square] = self.canvas.create_rectangle(x, y, x + self.square_size, y + self.square_size, fill = fill, outline = "", tags = ("square", f"sq_{square}"))
+        self._sel_id = self.canvas.create_rectangle(0, 0, 0, 0, outline = "#FFD700", width = 4, state = "hidden") #Selected piece ring
+        #File and rank labels sit in fixed places, only their text changes with orientation
+        self._file_ids = []
+        for column in range(8):
+            cx = self.margin + column * self.square_size + self.square_size / 2
+            cy = self.margin + 8 * self.square_size + self.margin / 2
+            self._file_ids.append(self.canvas.create_text(cx, cy, anchor = "center", font = self._coord_font, tags = "coord"))
+        self._rank_ids = []
+        for row in range(8):
+            cx = self.margin / 2
+            cy = self.margin + row * self.square_size + self.square_size / 2
+            self._rank_ids.append(self.canvas.create_text(cx, cy, anchor = "center", font = self._coord_font, tags = "coord"))
+        self._piece_ids = {} #Piece text item per occupied square
+        self._piece_text = {} #Unicode piece shown on each occupied square
+        self._layout_board()
         #Sidebar
         side = tk.Frame(mid)
         side.pack(side = "left", padx = (10, 0), fill = "y")
@@ -97,6 +135,12 @@ class ChessApp(tk.Frame):
         tk.Label(side, textvariable=self.eval_label_var, anchor = "w").pack(fill = "x")
         self.eval_canvas = tk.Canvas(side, width = 40, height = 280, highlightthickness = 1, highlightbackground = "#444")
         self.eval_canvas.pack(pady = (0, 12))
+        #Bar pieces are created once and resized on updates
+        self._eval_white_id = self.eval_canvas.create_rectangle(0, 0, 0, 0, fill = "#f5f5f5", outline = "")
+        self._eval_black_id = self.eval_canvas.create_rectangle(0, 0, 0, 0, fill = "#222222", outline = "")
+        w = int(self.eval_canvas["width"])
+        h = int(self.eval_canvas["height"])
+        self.eval_canvas.create_line(0, h // 2, w, h // 2, fill = "#888")
         #Moves header + Go Live (Resume)
         hdr = tk.Frame(side)
         hdr.pack(fill = "x")
@@ -184,12 +228,14 @@ class ChessApp(tk.Frame):
         self.legal_dests = set() #Clear legal moves
         self.game_over = False #Game is not over anymore
         self.ai_thinking = False #Not engine's turn initially (game hasn't started)
+        if self._ai_future is not None: #A search for the old game would keep the worker busy, start a fresh one
+            self._restart_engine()
         #Reset history and cached old boards
         self.move_objs.clear()
         self.move_sans.clear()
-        self.move_evals.clear()
         self.view_ply = None
-        self._cached_view_board = None
+        self._board_snapshots = [chess.Board()]
+        self._legal_cache = None
         #Reenable Buttons
         self.draw_btn.config(state = "normal")
         self.resign_btn.config(state = "normal")
@@ -197,7 +243,8 @@ class ChessApp(tk.Frame):
         self._refresh_moves_table()
         self._update_eval_bar(self.board)
         self._set_status()
-        self._redraw()
+        self._layout_board() #Orientation may have gone back to the default
+        self._schedule_redraw()
         #If not human's turn, engine plays first
         if self.board.turn != self.human_color:
             self._start_ai_move()
@@ -210,7 +257,7 @@ class ChessApp(tk.Frame):
         if self.game_over: #Game has to be ongoing
             return
         b = self._get_display_board()
-        score = evaluate(b) #Get evaluation
+        score = self._eval(b) #Get evaluation
         if abs(score) <= 500: #Only agree to draw if within 5 points of material
             self._end_game("Draw agreed.")
         else:
@@ -228,14 +275,16 @@ class ChessApp(tk.Frame):
 
     def flip_board(self):
         self.flipped = not self.flipped #Flip board
-        self._redraw() #Flip board 180 degrees with coordinates
+        self._layout_board() #Move every square, label and piece 180 degrees
+        self._schedule_redraw()
 
     def go_live(self):
         if self.game_over: #Can't go back to play a game that is over
             return
         #If game is ongoing, view live position
+        unchanged = (self.view_ply is None or self.view_ply == len(self.move_objs)) and self.selected is None #Live position already on screen with nothing to clear
         self.view_ply = None
-        self._cached_view_board = None
+        self._legal_cache = None
         self.selected = None
         self.legal_dests = set()
         #Clear legal moves for a selection
@@ -244,7 +293,8 @@ class ChessApp(tk.Frame):
         #Update evaluation
         self._update_eval_bar(self.board)
         self._set_status("Back to live position")
-        self._redraw()
+        if not unchanged:
+            self._schedule_redraw()
         #If it's the engine's turn, start it
         if (not self.game_over and self.board.turn != self.human_color and not self.board.is_game_over(claim_draw=True) and not self.ai_thinking):
             self._start_ai_move()
@@ -265,7 +315,7 @@ class ChessApp(tk.Frame):
         #Clear selections and legal moves
         self.selected = None
         self.legal_dests = set()
-        self._redraw()
+        self._schedule_redraw()
         messagebox.showinfo("Game Over", message)
 
     # -------------- Moves Analysis Table (White/Black columns) -------------- #
@@ -274,13 +324,19 @@ class ChessApp(tk.Frame):
         Docstring for _refresh_moves_table
         Shows old table based on SAN
         '''
-        for item in self.moves_tree.get_children(): #Clear existing moves
-            self.moves_tree.delete(item)
-        rows = (len(self.move_sans) + 1) // 2 #Number of rows for table
-        for i in range(rows):
-            w = self.move_sans[2 * i] if 2 * i < len(self.move_sans) else "" #White SAN
-            b = self.move_sans[2 * i + 1] if 2 * i + 1 < len(self.move_sans) else "" #Black SAN
-            self.moves_tree.insert("", "end", iid = str(i + 1), values = (str(i + 1), w, b)) #Scrolling and selecting move by ID
+        plies = len(self.move_sans)
+        if plies < self._last_rendered_plies: #History got shorter (new game), start the table over
+            for item in self.moves_tree.get_children(): #Clear existing moves
+                self.moves_tree.delete(item)
+            self._last_rendered_plies = 0
+        for ply in range(self._last_rendered_plies, plies): #Only plies not shown yet
+            row = str(ply // 2 + 1)
+            if ply % 2 == 0: #White move starts a new row
+                self.moves_tree.insert("", "end", iid = row, values = (row, self.move_sans[ply], "")) #Scrolling and selecting move by ID
+            else: #Black move fills in the last row
+                self.moves_tree.set(row, "B", self.move_sans[ply])
+        self._last_rendered_plies = plies
+        rows = (plies + 1) // 2 #Number of rows for table
         if rows > 0: #Scroll to bottom
             self.moves_tree.see(str(rows))
         #Highlight current row in live mode
@@ -317,14 +373,13 @@ class ChessApp(tk.Frame):
         self.moves_tree.selection_set(row_id)
         #View and clear selection state
         self.view_ply = ply_index + 1
-        self._cached_view_board = None
         self.selected = None
         self.legal_dests = set()
         #Update evaulation bar and reset board to before viewing
         vb = self._get_display_board()
         self._update_eval_bar(vb)
         self._set_status()
-        self._redraw()
+        self._schedule_redraw()
 
     # -------------- Evaluation Bar -------------- #
 
@@ -342,21 +397,41 @@ class ChessApp(tk.Frame):
         Docstring for _update_eval_bar
         Updating and displaying the visual evaluation bar
         '''
-        score = evaluate(board)
-        self.eval_label_var.set(self._format_eval_text(score))
+        self._apply_eval_score(self._eval(board))
+
+    def _apply_eval_score(self, score: int):
+        '''
+        Docstring for _apply_eval_score
+        Displays an already computed score on the evaluation bar
+        '''
         # Clip display to 10 pawns in either color's favor
         CLIP = 1000
         s = max(-CLIP, min(CLIP, score))
         frac = (s + CLIP) / (2 * CLIP)  # 0..1 (0 = black winning, 1 = white winning)
-        #Clear old bar and reset size
-        self.eval_canvas.delete("all")
         w = int(self.eval_canvas["width"])
         h = int(self.eval_canvas["height"])
-        #Draw the bar itself
         white_h = int(h * frac)
-        self.eval_canvas.create_rectangle(0, 0, w, white_h, fill = "#f5f5f5", outline = "")
-        self.eval_canvas.create_rectangle(0, white_h, w, h, fill = "#222222", outline = "")
-        self.eval_canvas.create_line(0, h // 2, w, h // 2, fill = "#888")
+        if (score, white_h) == (self._last_eval_score, self._last_eval_white_h): #Nothing visible changed
+            return
+        self._last_eval_score, self._last_eval_white_h = score, white_h
+        self.eval_label_var.set(self._format_eval_text(score))
+        #Resize the bar itself
+        self.eval_canvas.coords(self._eval_white_id, 0, 0, w, white_h)
+        self.eval_canvas.coords(self._eval_black_id, 0, white_h, w, h)
+
+    def _eval(self, board: chess.Board) -> int:
+        '''
+        Docstring for _eval
+        Returns evaluate(board), remembered by python-chess's transposition key so repeat positions cost a dict lookup
+        '''
+        key = board._transposition_key()
+        score = self._eval_tt.get(key)
+        if score is None:
+            score = evaluate(board)
+            if len(self._eval_tt) >= EVAL_CACHE_SIZE: #Drop the oldest entry, dicts keep insertion order
+                del self._eval_tt[next(iter(self._eval_tt))]
+            self._eval_tt[key] = score
+        return score
 
     # -------------- Display Board -------------- #
 
@@ -365,33 +440,16 @@ class ChessApp(tk.Frame):
         Docstring for _get_display_board
         Returns the displayed board
         '''
-        if self.view_ply is None: #Blank board if no moves yet
+        if self.view_ply is None or self.view_ply == len(self.move_objs): #Live board, also when the latest move is clicked
             return self.board
-        if self._cached_view_board is not None: #Return cached board if exists
-            return self._cached_view_board
-        #Rebuild using move history
-        b = chess.Board()
-        for move in self.move_objs[:self.view_ply]:
-            b.push(move)
-        self._cached_view_board = b
-        return b
+        return self._board_snapshots[self.view_ply] #Position after view_ply moves, index 0 is the cached starting board
 
     def _square_to_xy(self, square: chess.Square):
         '''
         Docstring for _square_to_xy
         Converts the matrix from square to coordinates
         '''
-        file = chess.square_file(square) #Columns a-h
-        rank = chess.square_rank(square) #Rows 1-7
-        if not self.flipped: #Normal orientation
-            col = file
-            row = 7 - rank
-        else: #Flipped orientation
-            col = 7 - file
-            row = rank
-        x = self.margin + col * self.square_size
-        y = self.margin + row * self.square_size
-        return x, y #Returns coordinates
+        return self._sq_x[square], self._sq_y[square] #Returns coordinates, precomputed by _recompute_geometry
 
     def _xy_to_square(self, x, y):
         '''
@@ -402,62 +460,109 @@ class ChessApp(tk.Frame):
         y -= self.margin
         if x < 0 or y < 0:
             return None
-        col = x // self.square_size
-        row = y // self.square_size
-        if col < 0 or col > 7 or row < 0 or row > 7:
+        col = int(x // self.square_size)
+        row = int(y // self.square_size)
+        if col > 7 or row > 7:
             return None
+        return chess.square(self._col_to_file[col], self._row_to_rank[row]) #Return chess square
+
+# ---------------- Draw Board ---------------- #
+
+    def _recompute_geometry(self):
+        '''
+        Docstring for _recompute_geometry
+        Precomputes square <-> canvas lookups and (square, x, y, fill) for all 64 squares, geometry only changes with orientation
+        '''
         if not self.flipped: #Normal orientation
-            file = int(col)
-            rank = 7 - int(row)
+            self._col_to_file = list(range(8))
+            self._row_to_rank = list(range(7, -1, -1))
         else: #Flipped orientation
-            file = 7 - int(col)
-            rank = int(row)
-        return chess.square(file, rank) #Return chess square
+            self._col_to_file = list(range(7, -1, -1))
+            self._row_to_rank = list(range(8))
+        self._sq_x = [0] * 64
+        self._sq_y = [0] * 64
+        for col, file in enumerate(self._col_to_file):
+            for row, rank in enumerate(self._row_to_rank):
+                sq = chess.square(file, rank)
+                self._sq_x[sq] = self.margin + col * self.square_size
+                self._sq_y[sq] = self.margin + row * self.square_size
+        self._sq_xy = []
+        for sq in chess.SQUARES:
+            x, y = self._sq_x[sq], self._sq_y[sq]
+            light = (chess.square_file(sq) + chess.square_rank(sq)) & 1
+            fill = "#EEEED2" if light else "#769656"
+            self._sq_xy.append((sq, x, y, fill))
 
-# ---------------- Draw Board ---------------- #
+    def _layout_board(self):
+        '''
+        Docstring for _layout_board
+        Positions the persistent squares, coordinate labels, and pieces for the current orientation
+        '''
+        self._recompute_geometry()
+        square_ids = self._square_ids
+        for square, x, y, _ in self._sq_xy:
+            self.canvas.coords(square_ids[square], x, y, x + self.square_size, y + self.square_size)
+        for column, item in enumerate(self._file_ids):
+            file_idx = (7 - column) if self.flipped else column
+            self.canvas.itemconfig(item, text = chr(ord("a") + file_idx))
+        for row, item in enumerate(self._rank_ids):
+            rank_num = (row + 1) if self.flipped else (8 - row)
+            self.canvas.itemconfig(item, text = str(rank_num))
+        for square, item in self._piece_ids.items():
+            x, y = self._square_to_xy(square)
+            self.canvas.coords(item, x + self.square_size / 2, y + self.square_size / 2)
+
+    def _schedule_redraw(self):
+        '''
+        Docstring for _schedule_redraw
+        Queues one board redraw for when Tk is idle, so several state changes in a row only draw once
+        '''
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.master.after_idle(self._do_redraw)
+
+    def _do_redraw(self):
+        #Runs the queued redraw
+        self._redraw_pending = False
+        self._redraw()
 
     def _redraw(self):
         '''
         Docstring for _redraw
         Draws the chess board itself
+        Squares and labels are persistent, only the pieces that changed are created, edited, or deleted
         '''
         b = self._get_display_board() #Board in use
-        self.canvas.delete("all") #Clear previous
-        #Draw every square
-        for square in chess.SQUARES:
-            x, y = self._square_to_xy(square)
-            x2, y2 = x + self.square_size, y + self.square_size
-            file = chess.square_file(square)
-            rank = chess.square_rank(square)
-            light = (file + rank) % 2 == 1
-            fill = "#EEEED2" if light else "#769656"
-            self.canvas.create_rectangle(x, y, x2, y2, fill = fill, outline = "")
         #Highlight legal moves for a selected piece
+        if self.view_ply is None and self.selected is not None:
+            x, y = self._square_to_xy(self.selected)
+            self.canvas.coords(self._sel_id, x, y, x + self.square_size, y + self.square_size)
+            self.canvas.itemconfig(self._sel_id, state = "normal")
+        else:
+            self.canvas.itemconfig(self._sel_id, state = "hidden")
+        self.canvas.delete("dest")
         if self.view_ply is None:
-            if self.selected is not None:
-                x, y = self._square_to_xy(self.selected)
-                self.canvas.create_rectangle(x, y, x + self.square_size, y + self.square_size, outline = "#FFD700", width = 4)
             for square in self.legal_dests:
                 x, y = self._square_to_xy(square)
-                self.canvas.create_oval(x + self.square_size * 0.35, y + self.square_size * 0.35, x + self.square_size * 0.65, y + self.square_size * 0.65, outline = "", fill = "#000000", stipple = "gray50")
-        #Draw every piece
-        for square, piece in b.piece_map().items():
-            x, y = self._square_to_xy(square)
-            symbol = piece.symbol()
-            text = UNICODE_PIECES.get(symbol, symbol)
-            self.canvas.create_text(x + self.square_size / 2, y + self.square_size / 2, text = text, font = ("Segoe UI Symbol", int(self.square_size * 0.6)))
-        #Draw files
-        for column in range(8):
-            file_idx = (7 - column) if self.flipped else column
-            cx = self.margin + column * self.square_size + self.square_size / 2
-            cy = self.margin + 8 * self.square_size + self.margin / 2
-            self.canvas.create_text(cx, cy, text = chr(ord("a") + file_idx), anchor = "center", font = ("Arial", 14))
-        #Draw ranks
-        for row in range(8):
-            rank_num = (row + 1) if self.flipped else (8 - row)
-            cx = self.margin / 2
-            cy = self.margin + row * self.square_size + self.square_size / 2
-            self.canvas.create_text(cx, cy, text = str(rank_num), anchor = "center", font = ("Arial", 14))
+                self.canvas.create_oval(x + self.square_size * 0.35, y + self.square_size * 0.35, x + self.square_size * 0.65, y + self.square_size * 0.65, outline = "", fill = "#000000", stipple = "gray50", tags = "dest")
+        #Draw only the pieces that differ from what is on the canvas
+        texts = {} #Glyph per occupied square, grouped straight from the 12 piece bitboards
+        for pt, color, glyph in PIECE_GLYPHS:
+            for square in chess.scan_forward(b.pieces_mask(pt, color)):
+                texts[square] = glyph
+        for square in self._piece_ids.keys() - texts.keys(): #Squares that emptied
+            self.canvas.delete(self._piece_ids.pop(square))
+            del self._piece_text[square]
+        for square, text in texts.items():
+            item = self._piece_ids.get(square)
+            if item is None: #Newly occupied square
+                x, y = self._square_to_xy(square)
+                self._piece_ids[square] = self.canvas.create_text(x + self.square_size / 2, y + self.square_size / 2, text = text, font = self._piece_font, tags = "piece")
+                self._piece_text[square] = text
+            elif self._piece_text[square] != text: #Different piece on the square
+                self.canvas.itemconfig(item, text = text)
+                self._piece_text[square] = text
+        self.canvas.tag_raise("piece") #Pieces stay above the move hints
 
     # -------------- Move Handling -------------- #
 
@@ -486,14 +591,14 @@ class ChessApp(tk.Frame):
                 self.selected = sq
                 self.legal_dests = self._legal_destinations_from(sq)
                 self._set_status("Piece selected")
-                self._redraw()
+                self._schedule_redraw()
             return
         #Deselect piece
         if sq == self.selected:
             self.selected = None
             self.legal_dests = set()
             self._set_status()
-            self._redraw()
+            self._schedule_redraw()
             return
         #Create legal move from selected square
         mv = self._make_move_from_to(self.selected, sq)
@@ -502,69 +607,81 @@ class ChessApp(tk.Frame):
                 self.selected = sq
                 self.legal_dests = self._legal_destinations_from(sq)
                 self._set_status("Piece selected")
-                self._redraw()
+                self._schedule_redraw()
             return
         #SAN must be computed before moving, record to history for analysis
         san = self.board.san(mv)
         self.board.push(mv)
-        self._record_ply(mv, san)
+        score = self._record_ply(mv, san)
         #Show on board
         self.selected = None
         self.legal_dests = set()
         #Update evaluation bar and status and board
-        self._update_eval_bar(self.board)
+        self._apply_eval_score(score)
         self._set_status()
-        self._redraw()
+        self._schedule_redraw()
         #Make sure game didn't end
         if self._check_game_end():
             return
         #If game still ongoing, engine turn
         self._start_ai_move()
 
-    def _record_ply(self, mv: chess.Move, san: str):
+    def _record_ply(self, mv: chess.Move, san: str) -> int:
         '''
         Docstring for _record_ply
         Add move to history and refresh move table
+        Returns the evaluation of the new position so callers can show it without evaluating again
         '''
         #Append move and notation
         self.move_objs.append(mv)
         self.move_sans.append(san)
-        self.move_evals.append(evaluate(self.board))
-        self._cached_view_board = None #No cached board of new position
+        score = self._eval(self.board) #Shown on the eval bar, history positions are re-scored on demand through the eval cache
+        self._board_snapshots.append(self.board.copy(stack = False)) #Snapshot of the new position for history views
+        self._legal_cache = None #Legal moves changed with the position
         self._refresh_moves_table() #Refresh moves table
+        return score
 
     def _legal_destinations_from(self, from_sq):
         '''
         Docstring for _legal_destinations_from
         Returns list of legal destinations for a selected piece
         '''
-        dests = set()
-        for mv in self.board.legal_moves:
-            if mv.from_square == from_sq:
-                dests.add(mv.to_square)
-        return dests
+        dests, _ = self._get_legal_cache()
+        return dests.get(from_sq, set())
+
+    def _get_legal_cache(self):
+        '''
+        Docstring for _get_legal_cache
+        Returns the live position's legal destinations by from square and legal moves by (from, to), generating moves only once per position
+        '''
+        if self._legal_cache is None:
+            dests = defaultdict(set)
+            pairs = defaultdict(list)
+            for mv in self.board.legal_moves:
+                dests[mv.from_square].add(mv.to_square)
+                pairs[(mv.from_square, mv.to_square)].append(mv)
+            self._legal_cache = (dests, pairs)
+        return self._legal_cache
 
     def _make_move_from_to(self, from_sq, to_sq):
         '''
         Docstring for _make_move_from_to
         Makes legal move, prompts promotion if applicable
         '''
-        candidates = [mv for mv in self.board.legal_moves if mv.from_square == from_sq and mv.to_square == to_sq] #List of legal moves
+        _, pairs = self._get_legal_cache()
+        candidates = pairs.get((from_sq, to_sq), []) #List of legal moves
         if not candidates: #No legal moves
             return None
-        if len(candidates) == 1 and candidates[0].promotion is None: #Return move directly if move is forced and not a promotion
+        if candidates[0].promotion is None: #Return move directly if not a promotion, a from/to pair only has several moves when promoting
             return candidates[0]
         #Handle promotion
-        promo_moves = [mv for mv in candidates if mv.promotion is not None]
-        if promo_moves:
-            choice = self._promotion_dialog()
-            if choice is None:
-                return None
-            promo_piece = PROMO_MAP[choice]
-            for mv in promo_moves:
-                if mv.promotion == promo_piece:
-                    return mv
-            return promo_moves[0]
+        choice = self._promotion_dialog()
+        if choice is None:
+            return None
+        promo_piece = PROMO_MAP[choice]
+        for mv in candidates:
+            if mv.promotion == promo_piece:
+                return mv
         return candidates[0] #At the end, return first candidate if choice needs to be made
 
     def _promotion_dialog(self):
@@ -600,25 +717,80 @@ class ChessApp(tk.Frame):
 
     # -------------- Engine Move -------------- #
 
+    def _stop_engine(self):
+        '''
+        Docstring for _stop_engine
+        Shuts down the engine process without waiting for a search in progress to finish
+        '''
+        self._ai_future = None
+        workers = list((self._pool._processes or {}).values()) #Taken before shutdown, which forgets them
+        self._pool.shutdown(wait = False, cancel_futures = True)
+        for proc in workers:
+            proc.terminate()
+
+    def _restart_engine(self):
+        '''
+        Docstring for _restart_engine
+        Replaces the engine process with a fresh, idle one
+        '''
+        self._stop_engine()
+        self._pool = ProcessPoolExecutor(max_workers = 1)
+
+    def _on_close(self):
+        '''
+        Docstring for _on_close
+        Window close button, stops the engine before the window goes away
+        '''
+        self._stop_engine()
+        self.master.destroy()
+
+    def _on_destroy(self, event):
+        '''
+        Docstring for _on_destroy
+        Stops the engine if the app is destroyed some other way
+        '''
+        if event.widget is self:
+            self._stop_engine()
+
     def _start_ai_move(self):
         '''
         Docstring for _start_ai_move
-        Engine searches for move using new thread
+        Engine searches for move in a separate process
         '''
         if self.game_over or self.view_ply is not None:
             return
         self.ai_thinking = True
-        self._set_status()
-        self._redraw()
-        def worker(): #Search for best move on new thread
-            res = self.engine.best_move(self.board, self.depth)
-            self.master.after(0, lambda: self._apply_ai_move(res.move))
-        threading.Thread(target=worker, daemon=True).start() #Apply move on UI thread
+        self._set_status() #Only the status changes, the board on screen is already current
+        #Search for best move in the engine process, SAN is computed there too so the UI does no move generation
+        self._ai_future = self._pool.submit(search_position, self.board.copy(stack = False), self.depth) #Stackless copy, the search root never needs the game history
+        self._poll_ai_move(self._ai_future)
+
+    def _poll_ai_move(self, future):
+        '''
+        Docstring for _poll_ai_move
+        Checks on the engine process from the UI thread and applies its move once the search is done
+        '''
+        if future is not self._ai_future: #Search belongs to a game that was reset
+            return
+        if not future.done():
+            self.master.after(50, lambda: self._poll_ai_move(future))
+            return
+        self._ai_future = None
+        try:
+            uci, san = future.result()
+        except Exception as e: #Search failed or the engine process died, give the board back to the player
+            if isinstance(e, BrokenProcessPool): #A broken pool refuses new work
+                self._restart_engine()
+            self.ai_thinking = False
+            self._set_status(f"Engine error: {e}")
+            return
+        self._apply_ai_move(chess.Move.from_uci(uci) if uci else None, san) #Apply move on UI thread
 
-    def _apply_ai_move(self, move):
+    def _apply_ai_move(self, move, san):
         '''
         Docstring for _apply_ai_move
         Apply engine move to the game
+        :param san: SAN of the move, computed by the engine process before the move is played
         '''
         if self.game_over:
             return
@@ -629,14 +801,12 @@ class ChessApp(tk.Frame):
         if move is None: #No moves means game is over
             self._check_game_end()
             return
-        #Compute SAN before applying move
-        san = self.board.san(move)
         self.board.push(move)
-        self._record_ply(move, san) #Record move in history
+        score = self._record_ply(move, san) #Record move in history
         #Update evaluation bar, status, and redraw the board
-        self._update_eval_bar(self.board)
+        self._apply_eval_score(score)
         self._set_status()
-        self._redraw()
+        self._schedule_redraw()
         self._check_game_end() #See if game is over after engine move
 
     # -------------- (Stale?) Mate Detection -------------- #